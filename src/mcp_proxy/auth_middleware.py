@@ -1,78 +1,169 @@
 """Authentication middleware for the MCP proxy server."""
 
+import hmac
+import json
 import logging
 import os
-from typing import Callable
+import secrets
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
+# The auth token is a process-level secret; capture it once at import instead of
+# re-reading and re-validating the environment every time a middleware stack is built
+_AUTH_TOKEN = (os.getenv("MCP_PROXY_AUTH_TOKEN") or "").strip()
 
-class TokenAuthMiddleware(BaseHTTPMiddleware):
-    """Middleware to authenticate requests using a bearer token from environment variables."""
+_AUTH_HEADER = b"authorization"
+_BEARER_PREFIX = b"bearer "
+_BEARER_LEN = len(_BEARER_PREFIX)
+
+Message = dict[str, object]
+
+
+def _build_error_response(status: int, error: str, message: str) -> tuple[Message, Message]:
+    """Pre-serialize a JSON error response as a pair of ASGI messages."""
+    body = json.dumps({"error": error, "message": message}).encode("utf-8")
+    start: Message = {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+def maybe_install_auth(app: ASGIApp, auth_token: str | None = None) -> ASGIApp:
+    """Wrap *app* with token authentication only when a token is configured.
+
+    When no token is configured (MCP_PROXY_AUTH_TOKEN unset or blank, and no
+    explicit ``auth_token`` given) the app is returned unchanged, so disabled
+    auth costs nothing per request rather than an extra middleware frame that
+    re-checks a flag fixed at startup.
+    """
+    token = _AUTH_TOKEN if auth_token is None else auth_token.strip()
+    if token:
+        return TokenAuthMiddleware(app, auth_token=token)
+    logger.info(
+        "Token authentication is DISABLED - set MCP_PROXY_AUTH_TOKEN environment variable to enable",
+    )
+    return app
+
+
+class TokenAuthMiddleware:
+    """Middleware to authenticate requests using a bearer token from environment variables.
+
+    Implemented as a pure ASGI callable rather than a ``BaseHTTPMiddleware`` subclass,
+    so no Request/Response objects or background tasks are created per request and
+    streaming responses (e.g. ``/sse``) flow through ``send`` unbuffered.
+    """
+
+    def __init__(self, app: ASGIApp, auth_token: str | None = None) -> None:
+        self.app = app
+        self.auth_token = _AUTH_TOKEN if auth_token is None else auth_token.strip()
+        self.enabled = len(self.auth_token) > 0
+        self.auth_token_bytes = self.auth_token.encode("utf-8")
+
+        # Compare fixed-size HMACs instead of raw tokens so timing is independent
+        # of the submitted token's length, not just its content
+        self._pepper = secrets.token_bytes(32)
+        self._expected_mac = hmac.new(self._pepper, self.auth_token_bytes, "sha256").digest()
+
+        # Last token that passed validation; repeat presentations (the common
+        # case for long-lived sessions) skip the two HMAC computations
+        self._last_valid: bytes | None = None
 
-    def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
-        self.auth_token = os.getenv("MCP_PROXY_AUTH_TOKEN")
-        self.enabled = self.auth_token is not None and len(self.auth_token.strip()) > 0
-        
         # Paths that don't require authentication
-        self.public_paths = {"/status"}
-        
+        self.public_paths = frozenset({"/status"})
+
+        # Failure responses are fixed, so build and serialize them once
+        self._missing_header_response = _build_error_response(
+            401,
+            "Missing authorization header",
+            "Include 'Authorization: Bearer <token>' header",
+        )
+        self._bad_format_response = _build_error_response(
+            401,
+            "Invalid authorization format",
+            "Use 'Bearer <token>' format",
+        )
+        self._bad_token_response = _build_error_response(
+            403,
+            "Invalid token",
+            "The provided token is not valid",
+        )
+
         if self.enabled:
             logger.info("Token authentication is ENABLED - all endpoints except /status require authentication")
         else:
             logger.info("Token authentication is DISABLED - set MCP_PROXY_AUTH_TOKEN environment variable to enable")
-        
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and check authentication if enabled."""
+        # Only HTTP requests are authenticated; pass lifespan/websocket scopes
+        # straight through before touching any other state
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Allow access to public paths before any other work, so /status
+        # health checks cost nothing beyond the membership test
+        path = scope["path"]
+        if path in self.public_paths:
+            await self.app(scope, receive, send)
+            return
+
         # Skip authentication if not enabled
         if not self.enabled:
-            return await call_next(request)
-            
-        # Allow access to public paths
-        if request.url.path in self.public_paths:
-            return await call_next(request)
-            
-        # Check for authorization header
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            logger.warning("Authentication failed: Missing authorization header for %s", request.url.path)
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "Missing authorization header", 
-                    "message": "Include 'Authorization: Bearer <token>' header"
-                }
-            )
-            
-        # Validate token format
-        if not auth_header.startswith("Bearer "):
-            logger.warning("Authentication failed: Invalid authorization format for %s", request.url.path)
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "Invalid authorization format", 
-                    "message": "Use 'Bearer <token>' format"
-                }
-            )
-            
-        # Extract and validate token
-        token = auth_header[7:]  # Remove "Bearer " prefix
-        if token != self.auth_token:
-            logger.warning("Authentication failed: Invalid token for %s", request.url.path)
-            return JSONResponse(
-                status_code=403,
-                content={
-                    "error": "Invalid token", 
-                    "message": "The provided token is not valid"
-                }
-            )
-            
-        # Token is valid, proceed with request
-        logger.debug("Authentication successful for %s", request.url.path)
-        return await call_next(request) 
\ No newline at end of file
+            await self.app(scope, receive, send)
+            return
+
+        # Find the authorization header with a single scan; ASGI guarantees
+        # header names are already lowercased bytes
+        auth_value = None
+        for name, value in scope["headers"]:
+            if name == _AUTH_HEADER:
+                auth_value = value
+                break
+
+        # Flat ladder over the raw header bytes: missing header, wrong scheme,
+        # wrong token, or pass through
+        if auth_value is None:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Authentication failed: Missing authorization header for %s", path)
+            start, body = self._missing_header_response
+        elif len(auth_value) < _BEARER_LEN or auth_value[:_BEARER_LEN].lower() != _BEARER_PREFIX:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Authentication failed: Invalid authorization format for %s", path)
+            start, body = self._bad_format_response
+        elif not self._token_ok(auth_value[_BEARER_LEN:]):
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Authentication failed: Invalid token for %s", path)
+            start, body = self._bad_token_response
+        else:
+            # Token is valid, proceed with request
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Authentication successful for %s", path)
+            await self.app(scope, receive, send)
+            return
+
+        await send(start)
+        await send(body)
+
+    def _token_ok(self, token: bytes) -> bool:
+        """Validate a submitted token, fast-pathing repeats of the last valid one.
+
+        Only positive results are cached, and the fast path still uses a
+        constant-time compare, so rejected tokens always go through the full
+        fixed-size HMAC comparison.
+        """
+        last = self._last_valid
+        if last is not None and len(token) == len(last) and hmac.compare_digest(token, last):
+            return True
+        received_mac = hmac.new(self._pepper, token, "sha256").digest()
+        if hmac.compare_digest(received_mac, self._expected_mac):
+            self._last_valid = bytes(token)
+            return True
+        return False
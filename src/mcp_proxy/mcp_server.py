@@ -21,7 +21,7 @@ from starlette.responses import JSONResponse, Response
 from starlette.routing import BaseRoute, Mount, Route
 from starlette.types import Receive, Scope, Send
 
-from .auth_middleware import TokenAuthMiddleware
+from .auth_middleware import maybe_install_auth
 from .proxy_server import create_proxy_server
 
 logger = logging.getLogger(__name__)
@@ -169,10 +169,7 @@ async def run_mcp_server(
             return
 
         middleware: list[Middleware] = []
-        
-        # Add authentication middleware first
-        middleware.append(Middleware(TokenAuthMiddleware))
-        
+
         if mcp_settings.allow_origins:
             middleware.append(
                 Middleware(
@@ -190,8 +187,10 @@ async def run_mcp_server(
             lifespan=combined_lifespan,
         )
 
+        # Wrap the app with token authentication only when a token is configured,
+        # so disabled auth adds no per-request overhead.
         config = uvicorn.Config(
-            starlette_app,
+            maybe_install_auth(starlette_app),
             host=mcp_settings.bind_host,
             port=mcp_settings.port,
             log_level=mcp_settings.log_level.lower(),
@@ -1,7 +1,6 @@
 """Tests for the authentication middleware."""
 
-import os
-from unittest.mock import AsyncMock, patch
+from collections.abc import Callable
 
 import pytest
 from starlette.applications import Starlette
@@ -11,200 +10,143 @@ from starlette.responses import JSONResponse, Response
 from starlette.routing import Route
 from starlette.testclient import TestClient
 
-from mcp_proxy.auth_middleware import TokenAuthMiddleware
+from mcp_proxy import auth_middleware
+from mcp_proxy.auth_middleware import TokenAuthMiddleware, maybe_install_auth
 
+TEST_TOKEN = "test_token_12345"
 
-@pytest.fixture
-def mock_app():
+
+def _build_app(token: str) -> Starlette:
     """Create a simple test app with the auth middleware."""
+
     async def test_endpoint(request: Request) -> Response:
         return JSONResponse({"message": "success"})
 
     async def status_endpoint(request: Request) -> Response:
         return JSONResponse({"status": "ok"})
 
-    app = Starlette(
+    return Starlette(
         routes=[
             Route("/test", endpoint=test_endpoint),
             Route("/status", endpoint=status_endpoint),
         ],
-        middleware=[Middleware(TokenAuthMiddleware)]
+        middleware=[Middleware(TokenAuthMiddleware, auth_token=token)],
     )
-    return app
 
 
 @pytest.fixture
-def client(mock_app):
-    """Create a test client."""
-    return TestClient(mock_app)
-
-
-def test_auth_disabled_by_default(client):
-    """Test that authentication is disabled when no token is set."""
-    with patch.dict(os.environ, {}, clear=True):
-        # Both endpoints should be accessible without auth
-        response = client.get("/test")
-        assert response.status_code == 200
-        assert response.json() == {"message": "success"}
-
-        response = client.get("/status")
-        assert response.status_code == 200
-        assert response.json() == {"status": "ok"}
-
-
-def test_auth_enabled_with_token():
-    """Test that authentication is enabled when token is set."""
-    test_token = "test_token_12345"
-    
-    with patch.dict(os.environ, {"MCP_PROXY_AUTH_TOKEN": test_token}):
-        app = Starlette(
-            routes=[
-                Route("/test", endpoint=lambda r: JSONResponse({"message": "success"})),
-                Route("/status", endpoint=lambda r: JSONResponse({"status": "ok"})),
-            ],
-            middleware=[Middleware(TokenAuthMiddleware)]
-        )
-        client = TestClient(app)
-
-        # Status endpoint should still be accessible without auth
-        response = client.get("/status")
-        assert response.status_code == 200
-        assert response.json() == {"status": "ok"}
-
-        # Protected endpoint should require auth
-        response = client.get("/test")
-        assert response.status_code == 401
-        assert response.json() == {
-            "error": "Missing authorization header",
-            "message": "Include 'Authorization: Bearer <token>' header"
-        }
-
-
-def test_auth_with_correct_token():
-    """Test successful authentication with correct token."""
-    test_token = "test_token_12345"
-    
-    with patch.dict(os.environ, {"MCP_PROXY_AUTH_TOKEN": test_token}):
-        app = Starlette(
-            routes=[
-                Route("/test", endpoint=lambda r: JSONResponse({"message": "success"})),
-            ],
-            middleware=[Middleware(TokenAuthMiddleware)]
-        )
-        client = TestClient(app)
-
-        # Request with correct token should succeed
-        headers = {"Authorization": f"Bearer {test_token}"}
-        response = client.get("/test", headers=headers)
-        assert response.status_code == 200
-        assert response.json() == {"message": "success"}
-
-
-def test_auth_with_incorrect_token():
-    """Test authentication failure with incorrect token."""
-    test_token = "test_token_12345"
-    
-    with patch.dict(os.environ, {"MCP_PROXY_AUTH_TOKEN": test_token}):
-        app = Starlette(
-            routes=[
-                Route("/test", endpoint=lambda r: JSONResponse({"message": "success"})),
-            ],
-            middleware=[Middleware(TokenAuthMiddleware)]
-        )
-        client = TestClient(app)
-
-        # Request with incorrect token should fail
-        headers = {"Authorization": "Bearer wrong_token"}
-        response = client.get("/test", headers=headers)
-        assert response.status_code == 403
-        assert response.json() == {
-            "error": "Invalid token",
-            "message": "The provided token is not valid"
-        }
-
-
-def test_auth_with_invalid_format():
-    """Test authentication failure with invalid header format."""
-    test_token = "test_token_12345"
-    
-    with patch.dict(os.environ, {"MCP_PROXY_AUTH_TOKEN": test_token}):
-        app = Starlette(
-            routes=[
-                Route("/test", endpoint=lambda r: JSONResponse({"message": "success"})),
-            ],
-            middleware=[Middleware(TokenAuthMiddleware)]
-        )
-        client = TestClient(app)
-
-        # Request with invalid format should fail
-        headers = {"Authorization": "Basic some_token"}
-        response = client.get("/test", headers=headers)
-        assert response.status_code == 401
-        assert response.json() == {
-            "error": "Invalid authorization format",
-            "message": "Use 'Bearer <token>' format"
-        }
-
-
-def test_auth_with_empty_token():
-    """Test that empty token disables authentication."""
-    with patch.dict(os.environ, {"MCP_PROXY_AUTH_TOKEN": ""}):
-        app = Starlette(
-            routes=[
-                Route("/test", endpoint=lambda r: JSONResponse({"message": "success"})),
-            ],
-            middleware=[Middleware(TokenAuthMiddleware)]
-        )
-        client = TestClient(app)
-
-        # Empty token should disable auth
-        response = client.get("/test")
-        assert response.status_code == 200
-        assert response.json() == {"message": "success"}
-
-
-def test_auth_with_whitespace_only_token():
-    """Test that whitespace-only token disables authentication."""
-    with patch.dict(os.environ, {"MCP_PROXY_AUTH_TOKEN": "   "}):
-        app = Starlette(
-            routes=[
-                Route("/test", endpoint=lambda r: JSONResponse({"message": "success"})),
-            ],
-            middleware=[Middleware(TokenAuthMiddleware)]
-        )
-        client = TestClient(app)
-
-        # Whitespace-only token should disable auth
-        response = client.get("/test")
-        assert response.status_code == 200
-        assert response.json() == {"message": "success"}
-
-
-def test_status_endpoint_always_public():
-    """Test that /status endpoint is always accessible regardless of auth settings."""
-    test_token = "test_token_12345"
-    
-    with patch.dict(os.environ, {"MCP_PROXY_AUTH_TOKEN": test_token}):
-        app = Starlette(
-            routes=[
-                Route("/status", endpoint=lambda r: JSONResponse({"status": "ok"})),
-                Route("/test", endpoint=lambda r: JSONResponse({"message": "success"})),
-            ],
-            middleware=[Middleware(TokenAuthMiddleware)]
-        )
-        client = TestClient(app)
-
-        # Status should be accessible without token
-        response = client.get("/status")
-        assert response.status_code == 200
-        assert response.json() == {"status": "ok"}
-
-        # Test endpoint should require token
-        response = client.get("/test")
-        assert response.status_code == 401
-
-        # Status should still be accessible with token
-        headers = {"Authorization": f"Bearer {test_token}"}
-        response = client.get("/status", headers=headers)
-        assert response.status_code == 200
-        assert response.json() == {"status": "ok"} 
\ No newline at end of file
+def make_client() -> Callable[[str], TestClient]:
+    """Build a test client around a fresh app configured with the given token."""
+
+    def _make(token: str) -> TestClient:
+        return TestClient(_build_app(token))
+
+    return _make
+
+
+@pytest.mark.parametrize("token", ["", "   "])
+def test_auth_disabled(make_client: Callable[[str], TestClient], token: str) -> None:
+    """Test that empty or whitespace-only tokens disable authentication."""
+    client = make_client(token)
+
+    response = client.get("/test")
+    assert response.status_code == 200
+    assert response.json() == {"message": "success"}
+
+    response = client.get("/status")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected_status", "expected_body"),
+    [
+        (
+            {},
+            401,
+            {
+                "error": "Missing authorization header",
+                "message": "Include 'Authorization: Bearer <token>' header",
+            },
+        ),
+        (
+            {"Authorization": "Basic some_token"},
+            401,
+            {
+                "error": "Invalid authorization format",
+                "message": "Use 'Bearer <token>' format",
+            },
+        ),
+        (
+            {"Authorization": "Bearer wrong_token"},
+            403,
+            {
+                "error": "Invalid token",
+                "message": "The provided token is not valid",
+            },
+        ),
+        (
+            {"Authorization": f"Bearer {TEST_TOKEN}"},
+            200,
+            {"message": "success"},
+        ),
+    ],
+)
+def test_auth_enabled_responses(
+    make_client: Callable[[str], TestClient],
+    headers: dict[str, str],
+    expected_status: int,
+    expected_body: dict[str, str],
+) -> None:
+    """Test the middleware's response for each authentication outcome."""
+    client = make_client(TEST_TOKEN)
+
+    response = client.get("/test", headers=headers)
+    assert response.status_code == expected_status
+    assert response.json() == expected_body
+
+
+def test_status_endpoint_always_public(
+    make_client: Callable[[str], TestClient],
+) -> None:
+    """Test that /status is accessible with or without a token when auth is enabled."""
+    client = make_client(TEST_TOKEN)
+
+    response = client.get("/status")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+    response = client.get("/status", headers={"Authorization": f"Bearer {TEST_TOKEN}"})
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.parametrize("token", ["", "   "])
+def test_maybe_install_auth_disabled_returns_app_unchanged(token: str) -> None:
+    """Test that the factory skips the middleware entirely when no token is set."""
+    app = Starlette(routes=[])
+
+    assert maybe_install_auth(app, auth_token=token) is app
+
+
+def test_maybe_install_auth_enabled_wraps_app() -> None:
+    """Test that the factory installs the middleware when a token is set."""
+    app = Starlette(routes=[])
+
+    wrapped = maybe_install_auth(app, auth_token=TEST_TOKEN)
+
+    assert isinstance(wrapped, TokenAuthMiddleware)
+    assert wrapped.app is app
+
+
+def test_default_token_captured_at_import(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the middleware defaults to the token captured at module import."""
+    app = Starlette(routes=[])
+
+    monkeypatch.setattr(auth_middleware, "_AUTH_TOKEN", TEST_TOKEN)
+    middleware = TokenAuthMiddleware(app)
+    assert middleware.enabled
+    assert middleware.auth_token == TEST_TOKEN
+
+    monkeypatch.setattr(auth_middleware, "_AUTH_TOKEN", "")
+    assert maybe_install_auth(app) is app